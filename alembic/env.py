@@ -1,88 +1,11 @@
-from logging.config import fileConfig
 import os
 import sys
 
-from sqlalchemy import engine_from_config, pool
-from alembic import context
-
 # Ensure project root is on PYTHONPATH so `import app...` works
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
-# Alembic Config
-config = context.config
-
-# Logging
-if config.config_file_name is not None:
-    fileConfig(config.config_file_name)
-
-# Import app DB and settings, and load models so metadata is populated
-from app.database import Base  # noqa: E402
-from app.config import settings  # noqa: E402
-import app.models.user_models  # noqa: F401,E402
-import app.models.attendance_models  # noqa: F401,E402
-import app.models.session_models  # noqa: F401,E402
-
-# Use app's DATABASE_URL as the single source of truth
-config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
-
-# Provide metadata for autogenerate
-target_metadata = Base.metadata
-
-
-def run_migrations_offline() -> None:
-    """Run migrations in 'offline' mode.
-
-    This configures the context with just a URL
-    and not an Engine, though an Engine is acceptable
-    here as well.  By skipping the Engine creation
-    we don't even need a DBAPI to be available.
-
-    Calls to context.execute() here emit the given string to the
-    script output.
-
-    """
-    url = config.get_main_option("sqlalchemy.url")
-    context.configure(
-        url=url,
-        target_metadata=target_metadata,
-        literal_binds=True,
-        dialect_opts={"paramstyle": "named"},
-        compare_type=True,
-        compare_server_default=True,
-    )
-
-    with context.begin_transaction():
-        context.run_migrations()
-
-
-def run_migrations_online() -> None:
-    """Run migrations in 'online' mode.
-
-    In this scenario we need to create an Engine
-    and associate a connection with the context.
-
-    """
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section, {}),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
-
-    with connectable.connect() as connection:
-        context.configure(
-            connection=connection,
-            target_metadata=target_metadata,
-            compare_type=True,
-            compare_server_default=True,
-        )
-
-        with context.begin_transaction():
-            context.run_migrations()
-
+from app.alembic._env_base import run  # noqa: E402
 
-if context.is_offline_mode():
-    run_migrations_offline()
-else:
-    run_migrations_online()
+run()
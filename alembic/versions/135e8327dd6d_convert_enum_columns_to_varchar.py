@@ -0,0 +1,41 @@
+"""Convert enum columns to varchar
+
+Revision ID: 135e8327dd6d
+Revises: 8d2b5e3c1f7a
+Create Date: 2026-10-14 03:43:44.272592
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '135e8327dd6d'
+down_revision: Union[str, Sequence[str], None] = '8d2b5e3c1f7a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Store users.role and attendance.status as VARCHAR(32) and drop the native
+    roleenum/statusenum types. Values are validated by the ORM Enum types, so
+    adding a role no longer needs ALTER TYPE.
+    """
+    op.execute("ALTER TABLE users ALTER COLUMN role TYPE varchar(32) USING role::text")
+    op.execute("ALTER TABLE attendance ALTER COLUMN status TYPE varchar(32) USING status::text")
+    op.execute("DROP TYPE IF EXISTS roleenum, statusenum")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        "CREATE TYPE roleenum AS ENUM "
+        "('project_manager', 'supervisor', 'driver', 'delivery_associate', 'sweeper')"
+    )
+    op.execute("CREATE TYPE statusenum AS ENUM ('present', 'absent', 'late', 'half_day')")
+    op.execute("ALTER TABLE users ALTER COLUMN role TYPE roleenum USING role::roleenum")
+    op.execute("ALTER TABLE attendance ALTER COLUMN status TYPE statusenum USING status::statusenum")
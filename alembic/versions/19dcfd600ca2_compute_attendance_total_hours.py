@@ -0,0 +1,54 @@
+"""Compute attendance total_hours in the database
+
+Revision ID: 19dcfd600ca2
+Revises: ca7163bd23bf
+Create Date: 2026-10-14 05:21:37.804113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '19dcfd600ca2'
+down_revision: Union[str, Sequence[str], None] = 'ca7163bd23bf'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TOTAL_HOURS_SQL = 'EXTRACT(EPOCH FROM (check_out - check_in)) / 3600.0'
+
+
+def _create_history_index() -> None:
+    op.create_index(
+        'ix_attendance_user_id_date',
+        'attendance',
+        ['user_id', sa.text('date DESC')],
+        unique=False,
+        postgresql_include=['check_in', 'check_out', 'total_hours', 'status'],
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    A column cannot be turned into a generated one in place, so total_hours
+    is re-added; the covering history index includes it and is rebuilt.
+    """
+    op.drop_index('ix_attendance_user_id_date', table_name='attendance')
+    op.drop_column('attendance', 'total_hours')
+    op.add_column(
+        'attendance',
+        sa.Column('total_hours', sa.Float(), sa.Computed(TOTAL_HOURS_SQL, persisted=True), nullable=True),
+    )
+    _create_history_index()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_attendance_user_id_date', table_name='attendance')
+    op.drop_column('attendance', 'total_hours')
+    op.add_column('attendance', sa.Column('total_hours', sa.Float(), nullable=True))
+    op.execute(f'UPDATE attendance SET total_hours = {TOTAL_HOURS_SQL}')
+    _create_history_index()
@@ -0,0 +1,47 @@
+"""Add attendance history and team listing indexes
+
+Revision ID: 1c9defd90723
+Revises: 135e8327dd6d
+Create Date: 2026-10-14 03:52:10.418276
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c9defd90723'
+down_revision: Union[str, Sequence[str], None] = '135e8327dd6d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Covering index for per-user attendance history (and the user_id + date
+    lookups in check-in/check-out), plus a partial index for manager-scoped
+    listings of active users.
+    """
+    op.create_index(
+        'ix_attendance_user_id_date',
+        'attendance',
+        ['user_id', sa.text('date DESC')],
+        unique=False,
+        postgresql_include=['check_in', 'check_out', 'total_hours', 'status'],
+    )
+    op.create_index(
+        'ix_users_manager_id_active',
+        'users',
+        ['manager_id'],
+        unique=False,
+        postgresql_where=sa.text('is_active'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_manager_id_active', table_name='users')
+    op.drop_index('ix_attendance_user_id_date', table_name='attendance')
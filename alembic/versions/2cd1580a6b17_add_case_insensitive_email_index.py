@@ -0,0 +1,31 @@
+"""Add case-insensitive unique index on users.email
+
+Revision ID: 2cd1580a6b17
+Revises: b5f33f18f734
+Create Date: 2026-10-14 06:10:44.903127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2cd1580a6b17'
+down_revision: Union[str, Sequence[str], None] = 'b5f33f18f734'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Fails if existing emails differ only by case; merge those accounts first.
+    """
+    op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_users_email_lower', table_name='users')
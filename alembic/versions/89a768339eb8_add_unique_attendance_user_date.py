@@ -0,0 +1,33 @@
+"""Add unique (user_id, date) constraint to attendance
+
+Revision ID: 89a768339eb8
+Revises: 1c9defd90723
+Create Date: 2026-10-14 03:58:31.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '89a768339eb8'
+down_revision: Union[str, Sequence[str], None] = '1c9defd90723'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    One attendance record per user per day, enforced by the database so
+    check-in can use INSERT ... ON CONFLICT DO NOTHING. Fails if duplicate
+    (user_id, date) rows already exist; resolve those before upgrading.
+    """
+    op.create_unique_constraint('uq_attendance_user_date', 'attendance', ['user_id', 'date'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_attendance_user_date', 'attendance', type_='unique')
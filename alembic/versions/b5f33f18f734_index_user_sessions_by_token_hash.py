@@ -0,0 +1,40 @@
+"""Index user_sessions by token hash
+
+Revision ID: b5f33f18f734
+Revises: 19dcfd600ca2
+Create Date: 2026-10-14 05:48:09.216530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5f33f18f734'
+down_revision: Union[str, Sequence[str], None] = '19dcfd600ca2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    token_hash is the first 16 bytes of sha256(token), matching
+    app.utils.security.hash_token. Not unique: logins within the same second
+    can be issued identical tokens.
+    """
+    op.add_column('user_sessions', sa.Column('token_hash', sa.LargeBinary(length=16), nullable=True))
+    op.execute(
+        "UPDATE user_sessions "
+        "SET token_hash = substring(sha256(convert_to(token, 'UTF8')) from 1 for 16)"
+    )
+    op.alter_column('user_sessions', 'token_hash', nullable=False)
+    op.create_index(op.f('ix_user_sessions_token_hash'), 'user_sessions', ['token_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_sessions_token_hash'), table_name='user_sessions')
+    op.drop_column('user_sessions', 'token_hash')
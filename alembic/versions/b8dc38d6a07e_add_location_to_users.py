@@ -27,25 +27,25 @@ def upgrade() -> None:
     tables or ENUM types may have been created outside Alembic.
     """
     bind = op.get_bind()
-    inspector = sa.inspect(bind)
+    # Read the catalog once; every table check below uses this set
+    existing_tables = set(sa.inspect(bind).get_table_names())
 
-    # Pre-create ENUM types if they do not already exist
-    op.execute(text(
+    # Pre-create ENUM types if they do not already exist. Both are probed in
+    # one query (bool_or yields NULL, i.e. falsy, when neither type exists).
+    has_roleenum, has_statusenum = bind.execute(text(
         """
-        DO $$
-        BEGIN
-            IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'roleenum') THEN
-                CREATE TYPE roleenum AS ENUM ('project_manager', 'supervisor', 'driver', 'delivery_associate', 'sweeper');
-            END IF;
-            IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'statusenum') THEN
-                CREATE TYPE statusenum AS ENUM ('present', 'absent', 'late', 'half_day');
-            END IF;
-        END$$;
+        SELECT bool_or(typname = 'roleenum'), bool_or(typname = 'statusenum')
+        FROM pg_type
+        WHERE typname IN ('roleenum', 'statusenum')
         """
-    ))
+    )).one()
+    if not has_roleenum:
+        op.execute("CREATE TYPE roleenum AS ENUM ('project_manager', 'supervisor', 'driver', 'delivery_associate', 'sweeper')")
+    if not has_statusenum:
+        op.execute("CREATE TYPE statusenum AS ENUM ('present', 'absent', 'late', 'half_day')")
 
     # users table
-    if not inspector.has_table('users'):
+    if 'users' not in existing_tables:
         op.create_table(
             'users',
             sa.Column('id', sa.Integer(), nullable=False),
@@ -60,7 +60,7 @@ def upgrade() -> None:
         op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
 
     # attendance table
-    if not inspector.has_table('attendance'):
+    if 'attendance' not in existing_tables:
         op.create_table(
             'attendance',
             sa.Column('id', sa.Integer(), nullable=False),
@@ -76,7 +76,7 @@ def upgrade() -> None:
         op.create_index(op.f('ix_attendance_id'), 'attendance', ['id'], unique=False)
 
     # user_sessions table
-    if not inspector.has_table('user_sessions'):
+    if 'user_sessions' not in existing_tables:
         op.create_table(
             'user_sessions',
             sa.Column('id', sa.Integer(), nullable=False),
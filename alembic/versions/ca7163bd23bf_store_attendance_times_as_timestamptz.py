@@ -0,0 +1,34 @@
+"""Store attendance check-in/check-out as timestamptz
+
+Revision ID: ca7163bd23bf
+Revises: 89a768339eb8
+Create Date: 2026-10-14 04:03:12.550937
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ca7163bd23bf'
+down_revision: Union[str, Sequence[str], None] = '89a768339eb8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Existing values were written with datetime.utcnow(), so they are
+    interpreted as UTC.
+    """
+    op.execute("ALTER TABLE attendance ALTER COLUMN check_in TYPE timestamptz USING check_in AT TIME ZONE 'UTC'")
+    op.execute("ALTER TABLE attendance ALTER COLUMN check_out TYPE timestamptz USING check_out AT TIME ZONE 'UTC'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE attendance ALTER COLUMN check_in TYPE timestamp USING check_in AT TIME ZONE 'UTC'")
+    op.execute("ALTER TABLE attendance ALTER COLUMN check_out TYPE timestamp USING check_out AT TIME ZONE 'UTC'")
@@ -0,0 +1,88 @@
+"""Shared Alembic environment logic.
+
+Both alembic/env.py and app/alembic/env.py delegate to run(), so fixes to
+migration setup only need to be made here. The env.py shims put the project
+root on sys.path before importing this module.
+"""
+from logging.config import fileConfig
+
+from sqlalchemy import engine_from_config, pool
+from alembic import context
+
+# Import app DB and settings, and load models so metadata is populated
+from app.config import settings
+from app.database import Base
+import app.models.user_models  # noqa: F401
+import app.models.attendance_models  # noqa: F401
+import app.models.session_models  # noqa: F401
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline(config) -> None:
+    """Run migrations in 'offline' mode.
+
+    This configures the context with just a URL
+    and not an Engine, though an Engine is acceptable
+    here as well.  By skipping the Engine creation
+    we don't even need a DBAPI to be available.
+
+    Calls to context.execute() here emit the given string to the
+    script output.
+
+    """
+    url = config.get_main_option("sqlalchemy.url")
+    context.configure(
+        url=url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        compare_type=True,
+        compare_server_default=True,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online(config) -> None:
+    """Run migrations in 'online' mode.
+
+    In this scenario we need to create an Engine
+    and associate a connection with the context.
+
+    """
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            compare_type=True,  # detect column type changes
+            compare_server_default=True,
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+def run() -> None:
+    """Entry point for env.py: configure logging and the URL, then migrate."""
+    # Read per invocation; context.config is only valid while env.py runs
+    config = context.config
+
+    # Logging
+    if config.config_file_name is not None:
+        fileConfig(config.config_file_name)
+
+    # Use app's DATABASE_URL as the single source of truth
+    config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+
+    if context.is_offline_mode():
+        run_migrations_offline(config)
+    else:
+        run_migrations_online(config)
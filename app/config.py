@@ -1,13 +1,37 @@
 # app/config.py
-import os
-from dotenv import load_dotenv
+from functools import lru_cache
+from pathlib import Path
 
-# Load environment variables from .env file
-load_dotenv()
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+# .env lives at the project root, independent of the working directory
+ENV_FILE = Path(__file__).resolve().parent.parent / ".env"
+
+
+class Settings(BaseSettings):
+    # Environment variables take precedence over values in .env
+    model_config = SettingsConfigDict(env_file=ENV_FILE, extra="ignore")
+
+    DATABASE_URL: str
+    JWT_SECRET: str = "secretkey"
+
+    # Connection pool tuning (see app/database.py)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    # Set when connecting through PgBouncer in transaction mode: it does the
+    # pooling, so the app opens a connection per checkout (NullPool)
+    DB_NULL_POOL: bool = False
+
+    # bcrypt work factor for new hashes; existing hashes keep their own cost
+    BCRYPT_ROUNDS: int = 11
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
 
-class Settings:
-    DATABASE_URL = os.getenv("DATABASE_URL")
-    JWT_SECRET = os.getenv("JWT_SECRET", "secretkey")
 
 # Create a global instance called `settings`
-settings = Settings()
+settings = get_settings()
@@ -1,15 +1,55 @@
 # app/database.py
 
+import threading
+from contextvars import ContextVar
+
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import NullPool
 from app.config import settings
 
-# Connect to PostgreSQL (make sure DATABASE_URL is correct in .env)
-engine = create_engine(settings.DATABASE_URL)
+# Connect to PostgreSQL (make sure DATABASE_URL is correct in .env).
+# Keep a warm pool of connections so requests don't pay the connect/auth
+# handshake, and pre-ping so connections dropped by Postgres idle timeouts
+# are replaced transparently instead of failing the request.
+if settings.DB_NULL_POOL:
+    # PgBouncer (transaction mode) owns the pool. Server-side prepared
+    # statements don't survive its connection switching, so turn off
+    # psycopg's automatic preparation.
+    engine = create_engine(
+        settings.DATABASE_URL,
+        poolclass=NullPool,
+        connect_args={"prepare_threshold": None},
+    )
+else:
+    engine = create_engine(
+        settings.DATABASE_URL,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+
+# Identifies the current HTTP request; set by app.dependencies.DBSessionMiddleware
+request_scope: ContextVar = ContextVar("request_scope", default=None)
+
+
+def _session_scope():
+    # Outside a request (scripts, shells) fall back to one session per thread.
+    # Request code never gets here: get_db refuses to run without the
+    # middleware's scope.
+    return request_scope.get() or threading.get_ident()
+
 
-# Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# One session per request, shared by all dependencies and the endpoint and
+# closed by the middleware once the response (including streamed bodies)
+# has been sent.
+SessionLocal = scoped_session(
+    sessionmaker(autocommit=False, autoflush=False, bind=engine),
+    scopefunc=_session_scope,
+)
 
 # Base class for all ORM models
 Base = declarative_base()
@@ -1,10 +1,41 @@
-from app.database import SessionLocal
+from anyio import CancelScope, to_thread
 
+from app.database import SessionLocal, request_scope
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
 
+class DBSessionMiddleware:
+    """Scope SessionLocal to each HTTP request and close it afterwards.
+
+    Plain ASGI middleware rather than BaseHTTPMiddleware, so the session
+    stays open until a StreamingResponse has sent its last chunk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        reset_token = request_scope.set(object())
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # Closing returns the connection, and the pool's reset-on-return
+            # ROLLBACK is a blocking round trip: keep it off the event loop.
+            # The worker thread inherits request_scope, so it closes this
+            # request's session; shielded so a client disconnect can't skip it.
+            if SessionLocal.registry.has():
+                with CancelScope(shield=True):
+                    await to_thread.run_sync(SessionLocal.remove)
+            request_scope.reset(reset_token)
+
+
+async def get_db():
+    # Runs on the event loop, inside the request's scope; no threadpool hop
+    # and no teardown, since the middleware closes the session
+    if request_scope.get() is None:
+        # Without the middleware every request would share this thread's
+        # session and nothing would ever close it
+        raise RuntimeError("get_db requires DBSessionMiddleware to be installed on the app")
+    return SessionLocal()
@@ -1,9 +1,11 @@
 from fastapi import FastAPI
 from app.database import Base, engine
+from app.dependencies import DBSessionMiddleware
 from app.routes import auth_routes, attendance_routes
 from app.routes import admin_routes
 
 app = FastAPI(title="Attendance App with Auth")
+app.add_middleware(DBSessionMiddleware)
 
 app.include_router(auth_routes.router)
 app.include_router(attendance_routes.router)
@@ -13,3 +15,8 @@ app.include_router(admin_routes.router)
 @app.get("/")
 def home():
     return {"message": "Authentication system ready 🚀"}
+
+
+@app.get("/healthz")
+def healthz():
+    return {"status": "ok", "pool": engine.pool.status()}
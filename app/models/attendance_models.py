@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Date, DateTime, Float, Enum
+from sqlalchemy import Column, Computed, Integer, ForeignKey, Date, DateTime, Float, Enum, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.database import Base
 import enum
@@ -12,14 +12,26 @@ class StatusEnum(str, enum.Enum):
 
 class Attendance(Base):
     __tablename__ = "attendance"
+    # One record per user per day; check-in relies on this for ON CONFLICT
+    __table_args__ = (UniqueConstraint("user_id", "date", name="uq_attendance_user_date"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     date = Column(Date, default=date.today)
-    check_in = Column(DateTime, nullable=True)
-    check_out = Column(DateTime, nullable=True)
-    total_hours = Column(Float, default=0.0)
-    status = Column(Enum(StatusEnum), default=StatusEnum.present)
+    check_in = Column(DateTime(timezone=True), nullable=True)
+    check_out = Column(DateTime(timezone=True), nullable=True)
+    # Maintained by the database from check_in/check_out; NULL while open
+    total_hours = Column(Float, Computed("EXTRACT(EPOCH FROM (check_out - check_in)) / 3600.0", persisted=True))
+    status = Column(Enum(StatusEnum, native_enum=False, length=32), default=StatusEnum.present)
 
-    # Relationship to user table
-    user = relationship("User")
+    # Relationship to user table; load explicitly (see User relationships)
+    user = relationship("User", back_populates="attendance_records", lazy="raise")
+
+
+# Per-user history (user_id filter, newest first) served from the index alone
+Index(
+    "ix_attendance_user_id_date",
+    Attendance.user_id,
+    Attendance.date.desc(),
+    postgresql_include=["check_in", "check_out", "total_hours", "status"],
+)
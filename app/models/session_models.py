@@ -1,5 +1,5 @@
 # models/session_models.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, LargeBinary
 from datetime import datetime
 from app.database import Base
 
@@ -11,5 +11,7 @@ class UserSession(Base):
     device_id = Column(String, nullable=True)   # phone ID or browser fingerprint
     device_location = Column(String, nullable=True)  # human-readable device location
     token = Column(String, nullable=False)
+    # app.utils.security.hash_token(token); sessions are looked up by this
+    token_hash = Column(LargeBinary(16), nullable=False, index=True)
     login_time = Column(DateTime, default=datetime.utcnow)
     is_active = Column(Integer, default=1)
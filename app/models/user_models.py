@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, Enum, Integer, Date, ForeignKey, Boolean
+from sqlalchemy import Column, String, Enum, Integer, Date, ForeignKey, Boolean, Index, func
+from sqlalchemy.orm import relationship
 from app.database import Base
 import enum
 
@@ -9,6 +10,9 @@ class RoleEnum(str, enum.Enum):
     delivery_associate = "delivery_associate"
     sweeper = "sweeper"
 
+# Roles that manage a team; shared by the role checks in routes and services
+MANAGER_ROLES = frozenset({RoleEnum.project_manager, RoleEnum.supervisor})
+
 class User(Base):
     __tablename__ = "users"
 
@@ -16,10 +20,24 @@ class User(Base):
     name = Column(String, nullable=False)
     email = Column(String, unique=True, index=True)
     password_hash = Column(String, nullable=False)
-    role = Column(Enum(RoleEnum), nullable=False, default=RoleEnum.driver)
+    # Stored as VARCHAR (not a native PG enum) so new roles need no ALTER TYPE
+    role = Column(Enum(RoleEnum, native_enum=False, length=32), nullable=False, default=RoleEnum.driver)
     location = Column(String, nullable=True)
     picture = Column(String, nullable=True)  # URL or path to profile picture
     date_of_birth = Column(Date, nullable=True)
     joined_date = Column(Date, nullable=True)
     manager_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     is_active = Column(Boolean, nullable=False, default=True)
+
+    # Never loaded implicitly: queries that need them must say so with
+    # joinedload/selectinload, so a stray access can't turn into N+1 queries
+    manager = relationship("User", remote_side=[id], back_populates="reports", lazy="raise")
+    reports = relationship("User", back_populates="manager", lazy="raise")
+    attendance_records = relationship("Attendance", back_populates="user", lazy="raise")
+
+
+# list_users_for_manager filters on manager_id and, by default, is_active
+Index("ix_users_manager_id_active", User.manager_id, postgresql_where=User.is_active)
+
+# Emails are compared case-insensitively; this also serves those lookups
+Index("ix_users_email_lower", func.lower(User.email), unique=True)
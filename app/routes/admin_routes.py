@@ -2,11 +2,11 @@ from datetime import date
 from typing import Optional, List
 
 from fastapi import APIRouter, Depends, HTTPException, Path, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
 
-from app.models.user_models import User, RoleEnum
-from app.utils.jwt_handler import get_current_user
+from app.models.user_models import User, MANAGER_ROLES
+from app.utils.jwt_handler import get_current_user, forget_user
 from app.dependencies import get_db
 from app.utils.role_checker import role_required
 from app.schemas.user import (
@@ -23,34 +23,44 @@ from app.services.user_service import (
     assign_manager as assign_manager_service,
     set_active_status,
     list_team as list_team_service,
+    stream_team as stream_team_service,
     list_users_for_manager as list_users_for_manager_service,
-    get_user_for_manager as get_user_for_manager_service,
+    get_team_member_or_raise,
 )
 
 router = APIRouter(prefix="/users", tags=["Users (Admin)"])
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_require_manager = role_required(*MANAGER_ROLES)
 
 
+def _get_team_member(db: Session, manager: User, user_id: int) -> User:
+    try:
+        return get_team_member_or_raise(db, manager_id=manager.id, user_id=user_id)
+    except PermissionError:
+        raise HTTPException(status_code=403, detail="User is not in your team")
+    except ValueError:
+        raise HTTPException(status_code=404, detail="User not found")
 
 
-def _is_in_team(manager: User, employee: User) -> bool:
-    return employee.manager_id == manager.id
+def _json_array_stream(result):
+    """Encode streamed user rows as a JSON array, one chunk per fetched batch."""
+    yield b"["
+    first = True
+    for batch in result.partitions():
+        chunk = b",".join(UserOut.model_validate(u).model_dump_json().encode() for u in batch)
+        yield chunk if first else b"," + chunk
+        first = False
+    yield b"]"
 
 
 @router.put("/{user_id}/profile", response_model=UserOut, status_code=status.HTTP_200_OK)
 def update_user_profile(
     user_id: int = Path(..., gt=0),
     payload: UserProfileUpdate = None,
-    current_user: User = Depends(role_required(RoleEnum.project_manager, RoleEnum.supervisor)),
+    current_user: User = Depends(_require_manager),
     db: Session = Depends(get_db),
 ):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
     # Managers/supervisors can only update their team members
-    if not _is_in_team(current_user, user):
-        raise HTTPException(status_code=403, detail="User is not in your team")
+    member = _get_team_member(db, current_user, user_id)
     try:
         user = update_user_profile_service(
             db,
@@ -58,71 +68,51 @@ def update_user_profile(
             picture=payload.picture,
             date_of_birth=payload.date_of_birth,
             joined_date=payload.joined_date,
+            user=member,
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    return {
-        "id": user.id,
-        "name": user.name,
-        "email": user.email,
-        "role": user.role.value if hasattr(user.role, "value") else str(user.role),
-        "location": user.location,
-        "picture": user.picture,
-        "date_of_birth": user.date_of_birth,
-        "joined_date": user.joined_date,
-        "manager_id": user.manager_id,
-        "is_active": user.is_active,
-    }
+    forget_user(user_id)
+    return UserOut.model_validate(user)
 
 
 @router.put("/{user_id}/manager", status_code=status.HTTP_200_OK)
 def assign_manager(
     user_id: int = Path(..., gt=0),
     payload: AssignManagerRequest = None,
-    current_user: User = Depends(role_required(RoleEnum.project_manager, RoleEnum.supervisor)),
+    current_user: User = Depends(_require_manager),
     db: Session = Depends(get_db),
 ):
-    employee = db.query(User).filter(User.id == user_id).first()
-    if not employee:
-        raise HTTPException(status_code=404, detail="User not found")
-    if not _is_in_team(current_user, employee):
-        raise HTTPException(status_code=403, detail="User is not in your team")
+    member = _get_team_member(db, current_user, user_id)
     try:
-        employee = assign_manager_service(db, employee_id=user_id, manager_id=payload.manager_id)
+        employee = assign_manager_service(
+            db, employee_id=user_id, manager_id=payload.manager_id, employee=member
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    forget_user(user_id)
     return {"message": f"Assigned user {employee.id} to manager {employee.manager_id}"}
 
 
 @router.get("/team", response_model=List[UserOut], status_code=status.HTTP_200_OK)
 def list_my_team(
-    current_user: User = Depends(role_required(RoleEnum.project_manager, RoleEnum.supervisor)),
+    current_user: User = Depends(_require_manager),
     db: Session = Depends(get_db),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    stream: bool = Query(False, description="Stream the whole team from offset (limit is ignored)"),
 ):
+    if stream:
+        result = stream_team_service(db, manager_id=current_user.id, offset=offset)
+        return StreamingResponse(_json_array_stream(result), media_type="application/json")
     team = list_team_service(db, manager_id=current_user.id, limit=limit, offset=offset)
-    return [
-        {
-            "id": u.id,
-            "name": u.name,
-            "email": u.email,
-            "role": u.role.value if hasattr(u.role, "value") else str(u.role),
-            "location": u.location,
-            "picture": u.picture,
-            "date_of_birth": u.date_of_birth,
-            "joined_date": u.joined_date,
-            "manager_id": u.manager_id,
-            "is_active": u.is_active,
-        }
-        for u in team
-    ]
+    return [UserOut.model_validate(u) for u in team]
 
 
 @router.get("/", response_model=List[UserOut], status_code=status.HTTP_200_OK)
 def list_users(
     include_inactive: bool = Query(False, description="Include inactive users"),
-    current_user: User = Depends(role_required(RoleEnum.project_manager, RoleEnum.supervisor)),
+    current_user: User = Depends(_require_manager),
     db: Session = Depends(get_db),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
@@ -134,27 +124,13 @@ def list_users(
         limit=limit,
         offset=offset,
     )
-    return [
-        {
-            "id": u.id,
-            "name": u.name,
-            "email": u.email,
-            "role": u.role.value if hasattr(u.role, "value") else str(u.role),
-            "location": u.location,
-            "picture": u.picture,
-            "date_of_birth": u.date_of_birth,
-            "joined_date": u.joined_date,
-            "manager_id": u.manager_id,
-            "is_active": u.is_active,
-        }
-        for u in users
-    ]
+    return [UserOut.model_validate(u) for u in users]
 
 
 @router.post("/", response_model=UserOut, status_code=status.HTTP_201_CREATED)
 def create_user(
     payload: UserCreate,
-    current_user: User = Depends(role_required(RoleEnum.project_manager, RoleEnum.supervisor)),
+    current_user: User = Depends(_require_manager),
     db: Session = Depends(get_db),
 ):
     try:
@@ -174,32 +150,17 @@ def create_user(
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    return {
-        "id": user.id,
-        "name": user.name,
-        "email": user.email,
-        "role": user.role.value if hasattr(user.role, "value") else str(user.role),
-        "location": user.location,
-        "picture": user.picture,
-        "date_of_birth": user.date_of_birth,
-        "joined_date": user.joined_date,
-        "manager_id": user.manager_id,
-        "is_active": user.is_active,
-    }
+    return UserOut.model_validate(user)
 
 
 @router.put("/{user_id}", response_model=UserOut, status_code=status.HTTP_200_OK)
 def update_user(
     user_id: int = Path(..., gt=0),
     payload: UserUpdate = None,
-    current_user: User = Depends(role_required(RoleEnum.project_manager, RoleEnum.supervisor)),
+    current_user: User = Depends(_require_manager),
     db: Session = Depends(get_db),
 ):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    if not _is_in_team(current_user, user):
-        raise HTTPException(status_code=403, detail="User is not in your team")
+    member = _get_team_member(db, current_user, user_id)
     try:
         user = update_user_with_validation(
             db,
@@ -214,80 +175,48 @@ def update_user(
             joined_date=payload.joined_date,
             manager_id=payload.manager_id,
             is_active=payload.is_active,
+            user=member,
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    return {
-        "id": user.id,
-        "name": user.name,
-        "email": user.email,
-        "role": user.role.value if hasattr(user.role, "value") else str(user.role),
-        "location": user.location,
-        "picture": user.picture,
-        "date_of_birth": user.date_of_birth,
-        "joined_date": user.joined_date,
-        "manager_id": user.manager_id,
-        "is_active": user.is_active,
-    }
+    forget_user(user_id)
+    return UserOut.model_validate(user)
 
 
 @router.get("/{user_id}", response_model=UserOut, status_code=status.HTTP_200_OK)
 def get_user(
     user_id: int = Path(..., gt=0),
-    current_user: User = Depends(role_required(RoleEnum.project_manager, RoleEnum.supervisor)),
+    current_user: User = Depends(_require_manager),
     db: Session = Depends(get_db),
 ):
-    try:
-        user = get_user_for_manager_service(db, manager_id=current_user.id, user_id=user_id)
-    except PermissionError:
-        raise HTTPException(status_code=403, detail="User is not in your team")
-    except ValueError:
-        raise HTTPException(status_code=404, detail="User not found")
-    return {
-        "id": user.id,
-        "name": user.name,
-        "email": user.email,
-        "role": user.role.value if hasattr(user.role, "value") else str(user.role),
-        "location": user.location,
-        "picture": user.picture,
-        "date_of_birth": user.date_of_birth,
-        "joined_date": user.joined_date,
-        "manager_id": user.manager_id,
-        "is_active": user.is_active,
-    }
+    user = _get_team_member(db, current_user, user_id)
+    return UserOut.model_validate(user)
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_200_OK)
 def deactivate_user(
     user_id: int = Path(..., gt=0),
-    current_user: User = Depends(role_required(RoleEnum.project_manager, RoleEnum.supervisor)),
+    current_user: User = Depends(_require_manager),
     db: Session = Depends(get_db),
 ):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    if not _is_in_team(current_user, user):
-        raise HTTPException(status_code=403, detail="User is not in your team")
+    user = _get_team_member(db, current_user, user_id)
     if not user.is_active:
         return {"message": "User already deactivated"}
     try:
         user = set_active_status(db, acting_user_id=current_user.id, user_id=user_id, active=False)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    forget_user(user_id)
     return {"message": f"User {user.id} deactivated"}
 
 
 @router.post("/{user_id}/activate", status_code=status.HTTP_200_OK)
 def activate_user(
     user_id: int = Path(..., gt=0),
-    current_user: User = Depends(role_required(RoleEnum.project_manager, RoleEnum.supervisor)),
+    current_user: User = Depends(_require_manager),
     db: Session = Depends(get_db),
 ):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    if not _is_in_team(current_user, user):
-        raise HTTPException(status_code=403, detail="User is not in your team")
+    user = _get_team_member(db, current_user, user_id)
     if user.is_active:
         return {"message": "User already active"}
     try:
@@ -1,16 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Path, status
+import itertools
+import threading
+
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import and_, case, exists, func, lambda_stmt, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
-from datetime import datetime, date
+from datetime import date
 from typing import Optional, List
 
 from app.models.attendance_models import Attendance, StatusEnum
-from app.models.user_models import User, RoleEnum
+from app.models.user_models import User, MANAGER_ROLES
 from app.utils.jwt_handler import get_current_user
 from app.dependencies import get_db
 from app.schemas.attendance import AttendanceCreate, AttendanceUpdate, AttendanceOut
 
 router = APIRouter(prefix="/attendance", tags=["Attendance"])
 
+# Validates and serializes a whole page in one pass (see _attendance_page)
+_ATT_LIST_ADAPTER = TypeAdapter(List[AttendanceOut])
+
+# Serialized list_attendance pages per (user, generation, query). Writes bump
+# the user's generation, which makes all of their cached pages unreachable
+# at once. Per process: another worker may serve a page up to
+# _LIST_CACHE_TTL seconds old.
+_LIST_CACHE_TTL = 15
+_list_cache: TTLCache = TTLCache(maxsize=2048, ttl=_LIST_CACHE_TTL)
+# Only users written within the last 2 * _LIST_CACHE_TTL seconds are
+# tracked; a missing user is generation 0. Generations come from one
+# process-wide counter and are never reused, so a user dropping back to 0
+# can't revive pages: every page older than the write has expired by then.
+_list_generations: TTLCache = TTLCache(maxsize=50_000, ttl=2 * _LIST_CACHE_TTL)
+_generation_counter = itertools.count(1)
+_list_cache_lock = threading.Lock()
+
 
 """Schemas moved to app.schemas.attendance"""
 
@@ -19,17 +43,53 @@ router = APIRouter(prefix="/attendance", tags=["Attendance"])
 # Helpers
 # ==========================
 def is_manager(user: User) -> bool:
-    return user.role in {RoleEnum.project_manager, RoleEnum.supervisor}
+    return user.role in MANAGER_ROLES
+
+
+def _display_status(today: date):
+    """SQL expression for the status shown to clients.
+
+    Past days without a check-in are reported as absent and past days
+    without a check-out as half_day; today's open record keeps its stored
+    status (in progress).
+    """
+    return case(
+        (and_(Attendance.date < today, Attendance.check_in.is_(None)), StatusEnum.absent.value),
+        (and_(Attendance.date < today, Attendance.check_out.is_(None)), StatusEnum.half_day.value),
+        else_=Attendance.status,
+    ).label("status")
+
+
+def _attendance_json(rows) -> bytes:
+    return _ATT_LIST_ADAPTER.dump_json(_ATT_LIST_ADAPTER.validate_python(rows))
 
 
-def _compute_display_status(record: Attendance, today: date) -> StatusEnum:
-    computed = record.status
-    if record.date < today:
-        if record.check_in is None:
-            computed = StatusEnum.absent
-        elif record.check_out is None:
-            computed = StatusEnum.half_day
-    return computed
+def _attendance_page(rows) -> Response:
+    """JSON response for rows selected with _attendance_columns.
+
+    Returning a Response skips FastAPI's per-item response_model pass; the
+    adapter applies the same AttendanceOut schema in a single call.
+    """
+    return Response(content=_attendance_json(rows), media_type="application/json")
+
+
+def _invalidate_attendance(user_id: int) -> None:
+    """Drop cached list pages for a user; call after committing a write."""
+    with _list_cache_lock:
+        _list_generations[user_id] = next(_generation_counter)
+
+
+def _attendance_columns(today: date):
+    """Columns matching AttendanceOut, with the display status computed in SQL."""
+    return (
+        Attendance.id,
+        Attendance.user_id,
+        Attendance.date,
+        Attendance.check_in,
+        Attendance.check_out,
+        Attendance.total_hours,
+        _display_status(today),
+    )
 
 
 # ==========================
@@ -37,49 +97,60 @@ def _compute_display_status(record: Attendance, today: date) -> StatusEnum:
 # ==========================
 @router.post("/checkin")
 def check_in(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    today = date.today()
-    existing = (
-        db.query(Attendance)
-        .filter(Attendance.user_id == current_user.id, Attendance.date == today)
-        .first()
+    user_id, today = current_user.id, date.today()
+    # Single round trip: the (user_id, date) unique constraint rejects a
+    # second check-in for the same day, including concurrent ones. The
+    # database clock stamps check-in, as it does checkout.
+    # lambda_stmt caches the built statement; closure values become binds.
+    stmt = lambda_stmt(
+        lambda: insert(Attendance)
+        .values(user_id=user_id, date=today, check_in=func.now(), status=StatusEnum.present)
+        .on_conflict_do_nothing(index_elements=["user_id", "date"])
+        .returning(Attendance.check_in)
     )
-    if existing:
+    record = db.execute(stmt).first()
+    if record is None:
         raise HTTPException(status_code=400, detail="Already checked in today.")
-
-    record = Attendance(
-        user_id=current_user.id,
-        date=today,
-        check_in=datetime.utcnow(),
-        status=StatusEnum.present,
-    )
-    db.add(record)
     db.commit()
-    db.refresh(record)
+    _invalidate_attendance(user_id)
     return {"message": f"{current_user.name} checked in successfully", "time": record.check_in}
 
 
 @router.post("/checkout")
 def check_out(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    today = date.today()
-    record = (
-        db.query(Attendance)
-        .filter(Attendance.user_id == current_user.id, Attendance.date == today)
-        .first()
+    user_id, today = current_user.id, date.today()
+    # Close today's open record in one statement; the database stamps the
+    # checkout from its own clock and derives total_hours from it.
+    stmt = lambda_stmt(
+        lambda: update(Attendance)
+        .where(
+            Attendance.user_id == user_id,
+            Attendance.date == today,
+            Attendance.check_in.is_not(None),
+            Attendance.check_out.is_(None),
+            Attendance.check_in < func.now(),
+        )
+        .values(check_out=func.now())
+        .returning(Attendance.total_hours)
+        .execution_options(synchronize_session=False)
     )
+    record = db.execute(stmt).first()
 
-    if not record or not record.check_in:
-        raise HTTPException(status_code=400, detail="No check-in record found.")
-    if record.check_out:
-        raise HTTPException(status_code=400, detail="Already checked out today.")
-
-    now = datetime.utcnow()
-    if now <= record.check_in:
+    if record is None:
+        # Nothing was updated; look the record up only to report why
+        existing = (
+            db.query(Attendance.check_in, Attendance.check_out)
+            .filter(Attendance.user_id == user_id, Attendance.date == today)
+            .first()
+        )
+        if not existing or not existing.check_in:
+            raise HTTPException(status_code=400, detail="No check-in record found.")
+        if existing.check_out:
+            raise HTTPException(status_code=400, detail="Already checked out today.")
         raise HTTPException(status_code=400, detail="Checkout time must be after check-in.")
 
-    record.check_out = now
-    record.total_hours = (record.check_out - record.check_in).total_seconds() / 3600
     db.commit()
-    db.refresh(record)
+    _invalidate_attendance(user_id)
     return {
         "message": f"{current_user.name} checked out successfully",
         "total_hours": round(record.total_hours or 0, 2),
@@ -93,34 +164,15 @@ def get_attendance_history(
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
 ):
-    q = (
-        db.query(Attendance)
-        .filter(Attendance.user_id == current_user.id)
+    user_id, today = current_user.id, date.today()
+    stmt = lambda_stmt(
+        lambda: select(*_attendance_columns(today))
+        .where(Attendance.user_id == user_id)
         .order_by(Attendance.date.desc())
+        .offset(offset)
+        .limit(limit)
     )
-    records = q.offset(offset).limit(limit).all()
-    today = date.today()
-    result: List[AttendanceOut] = []
-    for r in records:
-        computed_status = r.status
-        if r.date < today:
-            if r.check_in is None:
-                computed_status = StatusEnum.absent
-            elif r.check_out is None:
-                computed_status = StatusEnum.half_day
-        # For today with no checkout, keep present (in-progress)
-        result.append(
-            {
-                "id": r.id,
-                "user_id": r.user_id,
-                "date": r.date,
-                "check_in": r.check_in,
-                "check_out": r.check_out,
-                "total_hours": r.total_hours,
-                "status": computed_status,
-            }
-        )
-    return result
+    return _attendance_page(db.execute(stmt).mappings())
 
 
 # ==========================
@@ -138,30 +190,33 @@ def create_attendance(
         raise HTTPException(status_code=403, detail="Not allowed to create for another user")
 
     target_date = payload.date or date.today()
-    exists = (
-        db.query(Attendance)
-        .filter(Attendance.user_id == target_user_id, Attendance.date == target_date)
-        .first()
-    )
-    if exists:
-        raise HTTPException(status_code=400, detail="Attendance record already exists for date")
-
-    record = Attendance(
-        user_id=target_user_id,
-        date=target_date,
-        check_in=payload.check_in,
-        check_out=payload.check_out,
-        status=payload.status or StatusEnum.present,
-    )
     # Validate time order if both provided
-    if record.check_in and record.check_out and record.check_out <= record.check_in:
+    if payload.check_in and payload.check_out and payload.check_out <= payload.check_in:
         raise HTTPException(status_code=400, detail="check_out must be after check_in")
-    if record.check_in and record.check_out:
-        record.total_hours = (record.check_out - record.check_in).total_seconds() / 3600
-    db.add(record)
+
+    # As in check-in, the (user_id, date) unique constraint detects an
+    # existing record, so insert and duplicate check are one round trip
+    stmt = (
+        insert(Attendance)
+        .values(
+            user_id=target_user_id,
+            date=target_date,
+            check_in=payload.check_in,
+            check_out=payload.check_out,
+            status=payload.status or StatusEnum.present,
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "date"])
+        .returning(Attendance)
+    )
+    record = db.scalars(stmt).first()
+    if record is None:
+        raise HTTPException(status_code=400, detail="Attendance record already exists for date")
+    # Serialize before commit: expire_on_commit would otherwise make the
+    # response reload the row it just got back from RETURNING
+    out = AttendanceOut.model_validate(record)
     db.commit()
-    db.refresh(record)
-    return record
+    _invalidate_attendance(target_user_id)
+    return out
 
 
 @router.get("/", response_model=List[AttendanceOut])
@@ -176,36 +231,45 @@ def list_attendance(
     offset: int = Query(0, ge=0),
     asc: bool = Query(False, description="Sort by date ascending if true"),
 ):
-    q = db.query(Attendance)
     if user_id is not None:
         if not is_manager(current_user) and user_id != current_user.id:
             raise HTTPException(status_code=403, detail="Not allowed to view other users")
-        q = q.filter(Attendance.user_id == user_id)
     else:
-        q = q.filter(Attendance.user_id == current_user.id)
+        user_id = current_user.id
+
+    # The page depends only on the target user and the query once access is
+    # checked; today is part of the key because it drives the display status
+    today = date.today()
+    with _list_cache_lock:
+        key = (
+            user_id,
+            _list_generations.get(user_id, 0),
+            today,
+            start_date,
+            end_date,
+            status_filter,
+            limit,
+            offset,
+            asc,
+        )
+        body = _list_cache.get(key)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
+
+    stmt = select(*_attendance_columns(today)).where(Attendance.user_id == user_id)
 
     if start_date:
-        q = q.filter(Attendance.date >= start_date)
+        stmt = stmt.where(Attendance.date >= start_date)
     if end_date:
-        q = q.filter(Attendance.date <= end_date)
+        stmt = stmt.where(Attendance.date <= end_date)
     if status_filter is not None:
-        q = q.filter(Attendance.status == status_filter)
+        stmt = stmt.where(Attendance.status == status_filter)
 
-    q = q.order_by(Attendance.date.asc() if asc else Attendance.date.desc())
-    records = q.offset(offset).limit(limit).all()
-    today = date.today()
-    return [
-        {
-            "id": r.id,
-            "user_id": r.user_id,
-            "date": r.date,
-            "check_in": r.check_in,
-            "check_out": r.check_out,
-            "total_hours": r.total_hours,
-            "status": _compute_display_status(r, today),
-        }
-        for r in records
-    ]
+    stmt = stmt.order_by(Attendance.date.asc() if asc else Attendance.date.desc())
+    body = _attendance_json(db.execute(stmt.offset(offset).limit(limit)).mappings())
+    with _list_cache_lock:
+        _list_cache[key] = body
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/{attendance_id}", response_model=AttendanceOut)
@@ -214,21 +278,16 @@ def get_attendance(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    record = db.query(Attendance).filter(Attendance.id == attendance_id).first()
+    record = (
+        db.query(*_attendance_columns(date.today()))
+        .filter(Attendance.id == attendance_id)
+        .first()
+    )
     if not record:
         raise HTTPException(status_code=404, detail="Attendance not found")
     if not is_manager(current_user) and record.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not allowed to view this record")
-    today = date.today()
-    return {
-        "id": record.id,
-        "user_id": record.user_id,
-        "date": record.date,
-        "check_in": record.check_in,
-        "check_out": record.check_out,
-        "total_hours": record.total_hours,
-        "status": _compute_display_status(record, today),
-    }
+    return record._asdict()
 
 
 @router.put("/{attendance_id}", response_model=AttendanceOut)
@@ -238,7 +297,7 @@ def update_attendance(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    record = db.query(Attendance).filter(Attendance.id == attendance_id).first()
+    record = db.get(Attendance, attendance_id)
     if not record:
         raise HTTPException(status_code=404, detail="Attendance not found")
     # Only managers can update attendance records
@@ -247,15 +306,13 @@ def update_attendance(
 
     if payload.date is not None:
         # Prevent duplicate date for same user when changing date
-        duplicate = (
-            db.query(Attendance)
-            .filter(
+        duplicate = db.query(
+            exists().where(
                 Attendance.user_id == record.user_id,
                 Attendance.date == payload.date,
                 Attendance.id != record.id,
             )
-            .first()
-        )
+        ).scalar()
         if duplicate:
             raise HTTPException(status_code=400, detail="Another record already exists for that date")
         record.date = payload.date
@@ -266,12 +323,11 @@ def update_attendance(
     if payload.status is not None:
         record.status = payload.status
 
-    if record.check_in and record.check_out:
-        if record.check_out <= record.check_in:
-            raise HTTPException(status_code=400, detail="check_out must be after check_in")
-        record.total_hours = (record.check_out - record.check_in).total_seconds() / 3600
+    if record.check_in and record.check_out and record.check_out <= record.check_in:
+        raise HTTPException(status_code=400, detail="check_out must be after check_in")
 
     db.commit()
+    _invalidate_attendance(record.user_id)
     db.refresh(record)
     return record
 
@@ -282,13 +338,15 @@ def delete_attendance(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    record = db.query(Attendance).filter(Attendance.id == attendance_id).first()
+    record = db.get(Attendance, attendance_id)
     if not record:
         raise HTTPException(status_code=404, detail="Attendance not found")
     # Only managers can delete attendance records
     if not is_manager(current_user):
         raise HTTPException(status_code=403, detail="Only managers can delete attendance records")
 
+    owner_id = record.user_id
     db.delete(record)
     db.commit()
+    _invalidate_attendance(owner_id)
     return None
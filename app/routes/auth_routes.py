@@ -3,18 +3,18 @@ from pydantic import BaseModel
 from datetime import date
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import RedirectResponse
+from sqlalchemy import exists, func
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
 from app.dependencies import get_db
 from app.models.user_models import User, RoleEnum
 from app.models.session_models import UserSession
-from app.utils.jwt_handler import create_access_token, get_current_user, oauth2_scheme
+from app.utils.jwt_handler import create_access_token, get_current_user, oauth2_scheme, forget_token
+from app.utils.security import hash_password, hash_token, verify_login, forget_login
 from typing import Optional
-from app.schemas.user import UserOut
+from app.schemas.user import Email, UserOut, normalize_email
 from app.schemas.auth import TokenResponse, RefreshResponse, MessageResponse
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 """Database session dependency is provided by app.dependencies.get_db"""
 
@@ -22,13 +22,29 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 
+def _role_str(role: RoleEnum) -> str:
+    # User.role always loads as a RoleEnum member
+    return role.value
+
+
+def _token_payload(user) -> dict:
+    """JWT claims for a User (or the cached user snapshot)."""
+    return {
+        "user_id": user.id,
+        "name": user.name,
+        "email": user.email,
+        "role": _role_str(user.role),
+        "location": user.location,
+    }
+
+
 class LoginRequest(BaseModel):
-    email: str
+    email: Email
     password: str
 
 class RegisterRequest(BaseModel):
     name: str
-    email: str
+    email: Email
     password: str
     role: str
     location: str
@@ -41,9 +57,9 @@ class RegisterRequest(BaseModel):
 
 @router.post("/register", response_model=MessageResponse)
 def register_user(request: RegisterRequest, db: Session = Depends(get_db)):
-    if db.query(User).filter(User.email == request.email).first():
+    if db.query(exists().where(func.lower(User.email) == request.email)).scalar():
         raise HTTPException(status_code=400, detail="Email already exists")
-    hashed_pw = pwd_context.hash(request.password)
+    hashed_pw = hash_password(request.password)
     # Coerce role to RoleEnum; raises ValueError if invalid
     try:
         role_value = RoleEnum(request.role)
@@ -74,24 +90,19 @@ def login(
     device_id: Optional[str] = Query(None, description="Client device identifier"),
     device_location: Optional[str] = Query(None, description="Client device location (human readable)"),
 ):
-    user = db.query(User).filter(User.email == form_data.username).first()
+    try:
+        email = normalize_email(form_data.username)
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    user = db.query(User).filter(func.lower(User.email) == email).first()
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     if not user.is_active:
         raise HTTPException(status_code=403, detail="Account is deactivated")
-    if not pwd_context.verify(form_data.password, user.password_hash):
+    if not verify_login(user.email, form_data.password, user.password_hash):
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    # Build JWT payload from the user instance, not the class
-    payload = {
-        "user_id": user.id,
-        "name": user.name,
-        "email": user.email,
-        "role": user.role.value if hasattr(user.role, "value") else str(user.role),
-        "location": user.location,
-    }
-
     # Weekly expiry (7 days)
-    token = create_access_token(payload, expires_minutes=7 * 24 * 60)
+    token = create_access_token(_token_payload(user), expires_minutes=7 * 24 * 60)
 
     # Persist login session with device info
     session = UserSession(
@@ -99,16 +110,16 @@ def login(
         device_id=device_id,
         device_location=device_location,
         token=token,
+        token_hash=hash_token(token),
         is_active=1,
     )
     db.add(session)
     db.commit()
-    # Return role as string for clients
-    role_str = user.role.value if hasattr(user.role, "value") else str(user.role)
     return {
         "access_token": token,
         "token_type": "bearer",
-        "role": role_str,
+        # Return role as string for clients
+        "role": _role_str(user.role),
         "session": {
             "user_id": user.id,
             "device_id": device_id,
@@ -125,12 +136,18 @@ def logout(
 ):
     session = (
         db.query(UserSession)
-        .filter(UserSession.user_id == current_user.id, UserSession.token == token, UserSession.is_active == 1)
+        .filter(
+            UserSession.user_id == current_user.id,
+            UserSession.token_hash == hash_token(token),
+            UserSession.is_active == 1,
+        )
         .first()
     )
     if session:
         session.is_active = 0
         db.commit()
+    forget_token(token)
+    forget_login(current_user.email)
     # Redirect to API docs as a "login page" placeholder; adjust for your frontend
     return RedirectResponse(url="/docs", status_code=307)
 
@@ -144,38 +161,25 @@ def refresh_token(
     from datetime import datetime
     session = (
         db.query(UserSession)
-        .filter(UserSession.user_id == current_user.id, UserSession.token == token, UserSession.is_active == 1)
+        .filter(
+            UserSession.user_id == current_user.id,
+            UserSession.token_hash == hash_token(token),
+            UserSession.is_active == 1,
+        )
         .first()
     )
     if not session:
         raise HTTPException(status_code=401, detail="Session not found or inactive")
 
-    payload = {
-        "user_id": current_user.id,
-        "name": current_user.name,
-        "email": current_user.email,
-        "role": current_user.role.value if hasattr(current_user.role, "value") else str(current_user.role),
-        "location": current_user.location,
-    }
-    new_token = create_access_token(payload, expires_minutes=7 * 24 * 60)
+    new_token = create_access_token(_token_payload(current_user), expires_minutes=7 * 24 * 60)
     session.token = new_token
+    session.token_hash = hash_token(new_token)
     session.login_time = datetime.utcnow()
     db.commit()
+    forget_token(token)
     return {"access_token": new_token, "token_type": "bearer"}
 
 
 @router.get("/me", response_model=UserOut)
 def get_me(current_user: User = Depends(get_current_user)):
-    role_str = current_user.role.value if hasattr(current_user.role, "value") else str(current_user.role)
-    return {
-        "id": current_user.id,
-        "name": current_user.name,
-        "email": current_user.email,
-        "role": role_str,
-        "location": current_user.location,
-        "picture": current_user.picture,
-        "date_of_birth": current_user.date_of_birth,
-        "joined_date": current_user.joined_date,
-        "manager_id": current_user.manager_id,
-        "is_active": current_user.is_active,
-    }
+    return UserOut.model_validate(current_user)
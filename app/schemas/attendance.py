@@ -1,13 +1,21 @@
-from datetime import datetime, date
-from typing import Optional, List
-from pydantic import BaseModel
+from datetime import datetime, date, timezone
+from typing import Annotated, Optional, List
+from pydantic import AfterValidator, BaseModel
 from app.models.attendance_models import StatusEnum
 
 
+def _assume_utc(value: datetime) -> datetime:
+    # check_in/check_out are timestamptz; treat naive client input as UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+UTCDateTime = Annotated[datetime, AfterValidator(_assume_utc)]
+
+
 class AttendanceBase(BaseModel):
     date: Optional[date] = None
-    check_in: Optional[datetime] = None
-    check_out: Optional[datetime] = None
+    check_in: Optional[UTCDateTime] = None
+    check_out: Optional[UTCDateTime] = None
     status: Optional[StatusEnum] = None
 
 
@@ -17,8 +25,8 @@ class AttendanceCreate(AttendanceBase):
 
 class AttendanceUpdate(BaseModel):
     date: Optional[date] = None
-    check_in: Optional[datetime] = None
-    check_out: Optional[datetime] = None
+    check_in: Optional[UTCDateTime] = None
+    check_out: Optional[UTCDateTime] = None
     status: Optional[StatusEnum] = None
 
 
@@ -1,7 +1,25 @@
+import re
 from datetime import date
-from typing import Optional
+from typing import Annotated, Optional
 
-from pydantic import BaseModel
+from pydantic import AfterValidator, BaseModel, ConfigDict
+
+from app.models.user_models import RoleEnum
+
+# Deliberately loose (one @, a dot in the domain, no whitespace); it rejects
+# obvious garbage before any database work without email-validator's cost.
+_EMAIL_RE = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+
+
+def normalize_email(value: str) -> str:
+    # Emails are stored and looked up lowercased (see ix_users_email_lower)
+    value = value.strip().lower()
+    if not _EMAIL_RE.fullmatch(value):
+        raise ValueError("Invalid email address")
+    return value
+
+
+Email = Annotated[str, AfterValidator(normalize_email)]
 
 
 class UserProfileUpdate(BaseModel):
@@ -16,7 +34,7 @@ class AssignManagerRequest(BaseModel):
 
 class UserCreate(BaseModel):
     name: str
-    email: str
+    email: Email
     password: str
     role: str
     location: str
@@ -29,7 +47,7 @@ class UserCreate(BaseModel):
 
 class UserUpdate(BaseModel):
     name: Optional[str] = None
-    email: Optional[str] = None
+    email: Optional[Email] = None
     role: Optional[str] = None
     location: Optional[str] = None
     picture: Optional[str] = None
@@ -40,10 +58,12 @@ class UserUpdate(BaseModel):
 
 
 class UserOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True, use_enum_values=True)
+
     id: int
     name: str
     email: str
-    role: str
+    role: RoleEnum
     location: Optional[str] = None
     picture: Optional[str] = None
     date_of_birth: Optional[date] = None
@@ -51,6 +71,3 @@ class UserOut(BaseModel):
     manager_id: Optional[int] = None
     is_active: bool
 
-    class Config:
-        from_attributes = True
-
@@ -1,11 +1,24 @@
 from typing import Optional
+from sqlalchemy import exists, func, lambda_stmt, select
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
 
-from app.models.user_models import User, RoleEnum
+from app.models.user_models import User, RoleEnum, MANAGER_ROLES
+from app.utils.security import hash_password
 
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Columns backing UserOut; list endpoints select these as plain rows
+# instead of loading full User instances.
+_USER_OUT_COLUMNS = (
+    User.id,
+    User.name,
+    User.email,
+    User.role,
+    User.location,
+    User.picture,
+    User.date_of_birth,
+    User.joined_date,
+    User.manager_id,
+    User.is_active,
+)
 
 
 def create_user(
@@ -22,14 +35,14 @@ def create_user(
     manager_id: Optional[int] = None,
     is_active: bool = True,
 ) -> User:
-    if db.query(User).filter(User.email == email).first():
+    if db.query(exists().where(func.lower(User.email) == email)).scalar():
         raise ValueError("Email already exists")
     try:
         role_value = RoleEnum(role)
     except ValueError:
         raise ValueError("Invalid role")
 
-    hashed_pw = pwd_context.hash(password)
+    hashed_pw = hash_password(password)
     user = User(
         name=name,
         email=email,
@@ -65,17 +78,17 @@ def create_user_with_manager_validation(
 ) -> User:
     # determine manager
     target_manager_id = manager_id or current_manager_id
-    manager = db.query(User).filter(User.id == target_manager_id).first()
-    if not manager or manager.role not in {RoleEnum.project_manager, RoleEnum.supervisor}:
+    manager = db.get(User, target_manager_id)
+    if not manager or manager.role not in MANAGER_ROLES:
         raise ValueError("Manager must be a valid manager/supervisor")
-    if email and db.query(User).filter(User.email == email).first():
+    if email and db.query(exists().where(func.lower(User.email) == email)).scalar():
         raise ValueError("Email already exists")
     try:
         role_value = RoleEnum(role)
     except ValueError:
         raise ValueError("Invalid role")
 
-    hashed_pw = pwd_context.hash(password)
+    hashed_pw = hash_password(password)
     user = User(
         name=name,
         email=email,
@@ -108,16 +121,20 @@ def update_user_with_validation(
     joined_date=None,
     manager_id: Optional[int] = None,
     is_active: Optional[bool] = None,
+    user: Optional[User] = None,
 ) -> User:
-    user = db.query(User).filter(User.id == user_id).first()
+    if user is None:
+        user = db.get(User, user_id)
     if not user:
         raise ValueError("User not found")
 
     if name is not None:
         user.name = name
     if email is not None:
-        existing = db.query(User).filter(User.email == email, User.id != user.id).first()
-        if existing:
+        in_use = db.query(
+            exists().where(func.lower(User.email) == email, User.id != user.id)
+        ).scalar()
+        if in_use:
             raise ValueError("Email already in use")
         user.email = email
     if role is not None:
@@ -136,8 +153,8 @@ def update_user_with_validation(
     if manager_id is not None:
         if manager_id == user.id:
             raise ValueError("User cannot be their own manager")
-        manager = db.query(User).filter(User.id == manager_id).first()
-        if not manager or manager.role not in {RoleEnum.project_manager, RoleEnum.supervisor}:
+        manager = db.get(User, manager_id)
+        if not manager or manager.role not in MANAGER_ROLES:
             raise ValueError("Assigned manager must have manager/supervisor role")
         user.manager_id = manager_id
     if is_active is not None:
@@ -157,8 +174,10 @@ def update_user_profile(
     picture: Optional[str] = None,
     date_of_birth=None,
     joined_date=None,
+    user: Optional[User] = None,
 ) -> User:
-    user = db.query(User).filter(User.id == user_id).first()
+    if user is None:
+        user = db.get(User, user_id)
     if not user:
         raise ValueError("User not found")
     if picture is not None:
@@ -177,14 +196,16 @@ def assign_manager(
     *,
     employee_id: int,
     manager_id: int,
+    employee: Optional[User] = None,
 ) -> User:
-    employee = db.query(User).filter(User.id == employee_id).first()
+    if employee is None:
+        employee = db.get(User, employee_id)
     if not employee:
         raise ValueError("User not found")
-    manager = db.query(User).filter(User.id == manager_id).first()
+    manager = db.get(User, manager_id)
     if not manager:
         raise ValueError("Manager not found")
-    if manager.role not in {RoleEnum.project_manager, RoleEnum.supervisor}:
+    if manager.role not in MANAGER_ROLES:
         raise ValueError("Assigned manager must have manager/supervisor role")
     if manager.id == employee.id:
         raise ValueError("User cannot be their own manager")
@@ -201,7 +222,7 @@ def set_active_status(
     user_id: int,
     active: bool,
 ) -> User:
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise ValueError("User not found")
     if user.id == acting_user_id and active is False:
@@ -219,13 +240,35 @@ def list_team(
     limit: int = 50,
     offset: int = 0,
 ):
-    return (
-        db.query(User)
-        .filter(User.manager_id == manager_id)
+    stmt = (
+        select(*_USER_OUT_COLUMNS)
+        .where(User.manager_id == manager_id)
         .offset(offset)
         .limit(limit)
-        .all()
     )
+    return db.execute(stmt).all()
+
+
+def stream_team(
+    db: Session,
+    *,
+    manager_id: int,
+    offset: int = 0,
+    batch_size: int = 100,
+):
+    """Return the manager's whole team as a result fetched in batches.
+
+    Rows are pulled through a server-side cursor ``batch_size`` at a time;
+    iterate ``.partitions()`` to consume one batch per step.
+    """
+    stmt = (
+        select(*_USER_OUT_COLUMNS)
+        .where(User.manager_id == manager_id)
+        .order_by(User.id)
+        .offset(offset)
+        .execution_options(yield_per=batch_size)
+    )
+    return db.execute(stmt)
 
 
 def list_users_for_manager(
@@ -236,22 +279,31 @@ def list_users_for_manager(
     limit: int = 50,
     offset: int = 0,
 ):
-    q = db.query(User).filter(User.manager_id == manager_id)
+    stmt = select(*_USER_OUT_COLUMNS).where(User.manager_id == manager_id)
     if not include_inactive:
-        q = q.filter(User.is_active == True)  # noqa: E712
-    return q.offset(offset).limit(limit).all()
+        stmt = stmt.where(User.is_active == True)  # noqa: E712
+    return db.execute(stmt.offset(offset).limit(limit)).all()
+
+
+def _raise_not_in_team(db: Session, user_id: int):
+    # Only on a miss: tell a missing user apart from a non-team member
+    if not db.query(exists().where(User.id == user_id)).scalar():
+        raise ValueError("User not found")
+    # signal a forbidden access for non-team member
+    raise PermissionError("User is not in your team")
 
 
-def get_user_for_manager(
+def get_team_member_or_raise(
     db: Session,
     *,
     manager_id: int,
     user_id: int,
 ) -> User:
-    user = db.query(User).filter(User.id == user_id).first()
+    # lambda_stmt caches the built statement; closure values become binds
+    stmt = lambda_stmt(
+        lambda: select(User).where(User.id == user_id, User.manager_id == manager_id)
+    )
+    user = db.execute(stmt).scalar_one_or_none()
     if not user:
-        raise ValueError("User not found")
-    if user.manager_id != manager_id:
-        # signal a forbidden access for non-team member
-        raise PermissionError("User is not in your team")
+        _raise_not_in_team(db, user_id)
     return user
@@ -1,50 +1,194 @@
+import hmac
+import itertools
+import threading
+import time
 from datetime import datetime, timedelta
-from jose import jwt, JWTError
+from types import SimpleNamespace
+
+from cachetools import Cache, LRUCache, TTLCache
+from jose import jwk, jwt, JWTError
+from jose.constants import ALGORITHMS
+from sqlalchemy.orm import raiseload
 from app.config import settings
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from app.models.user_models import User
 from app.models.session_models import UserSession
 from app.dependencies import get_db
+from app.utils.security import hash_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# HMAC key built once; passing a raw string makes jose re-parse and rebuild
+# it on every encode/decode. Tokens carry no audience, so skip that check.
+_JWT_KEY = jwk.construct(settings.JWT_SECRET, ALGORITHMS.HS256)
+_DECODE_OPTIONS = {"verify_aud": False}
+
+# Both caches below are keyed by hash_token(token) rather than the token
+# itself, and a hit is only used after a constant-time comparison with the
+# stored token, so lookups never compare client input with a secret.
+
+# Authenticated users by token, so repeat requests skip the JWT decode and the
+# session/user queries. Entries are per process and live at most
+# _USER_CACHE_TTL seconds; logout, refresh and admin changes to a user evict
+# them explicitly.
+_USER_CACHE_TTL = 30
+# Tokens this close to expiry are not cached, so expiry is always checked
+_USER_CACHE_MIN_LIFETIME = 5
+_USER_FIELDS = (
+    "id",
+    "name",
+    "email",
+    "role",
+    "location",
+    "picture",
+    "date_of_birth",
+    "joined_date",
+    "manager_id",
+    "is_active",
+)
+
+
+class _UserCache(TTLCache):
+    """TTLCache of (token, user snapshot, exp) entries indexed by user id.
+
+    keys_by_user follows every insert, eviction, expiry and pop, so
+    forget_user() touches only that user's keys instead of scanning.
+    """
+
+    def __init__(self, maxsize, ttl):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.keys_by_user = {}
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.keys_by_user.setdefault(value[1].id, set()).add(key)
+
+    def __delitem__(self, key):
+        # Raw read: the entry may already be past its TTL
+        user_id = Cache.__getitem__(self, key)[1].id
+        try:
+            super().__delitem__(key)
+        finally:
+            self._unindex(key, user_id)
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        for key, value in expired:
+            self._unindex(key, value[1].id)
+        return expired
+
+    def _unindex(self, key, user_id):
+        keys = self.keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.keys_by_user[user_id]
+
+
+_user_cache = _UserCache(maxsize=50_000, ttl=_USER_CACHE_TTL)
+# Verified JWT payloads by token. They stay valid until their own exp, so a
+# token whose user entry has aged out is re-checked against the session
+# table without paying for the signature check again.
+_payload_cache: LRUCache = LRUCache(maxsize=50_000)
+# Bumped by forget_user(). A lookup that started before the bump must not
+# cache the row it read, or it would reinstate the stale user. Values are
+# never reused; entries only need to outlive an in-flight lookup.
+_user_epochs = TTLCache(maxsize=50_000, ttl=_USER_CACHE_TTL)
+_epoch_counter = itertools.count(1)
+_user_cache_lock = threading.RLock()
+
 def create_access_token(data: dict, expires_minutes: int = 60):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=expires_minutes)
     to_encode.update({"exp": int(expire.timestamp())})
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET, algorithm="HS256")
+    encoded_jwt = jwt.encode(to_encode, _JWT_KEY, algorithm=ALGORITHMS.HS256)
     return encoded_jwt
 
 
+def forget_token(token: str) -> None:
+    """Drop the cached user and payload for a token (logout, refresh)."""
+    key = hash_token(token)
+    with _user_cache_lock:
+        _user_cache.pop(key, None)
+        _payload_cache.pop(key, None)
+
+
+def forget_user(user_id: int) -> None:
+    """Drop every cached token of a user, e.g. after a role or status change."""
+    with _user_cache_lock:
+        _user_epochs[user_id] = next(_epoch_counter)
+        # Purge expired entries first; pop() skips them and they'd stay indexed
+        _user_cache.expire()
+        for key in list(_user_cache.keys_by_user.get(user_id, ())):
+            _user_cache.pop(key, None)
+
+
+def _same_token(stored: bytes, token: str) -> bool:
+    return hmac.compare_digest(stored, token.encode("utf-8"))
+
+
+def _decode_token(token: str, key: bytes, now: float) -> dict:
+    with _user_cache_lock:
+        cached = _payload_cache.get(key)
+    if cached is not None and _same_token(cached[0], token) and cached[1].get("exp", 0) > now:
+        return cached[1]
+    # Raises JWTError (including ExpiredSignatureError) for bad tokens
+    payload = jwt.decode(token, _JWT_KEY, algorithms=[ALGORITHMS.HS256], options=_DECODE_OPTIONS)
+    with _user_cache_lock:
+        _payload_cache[key] = (token.encode("utf-8"), payload)
+    return payload
+
+
 """Database session dependency is provided by app.dependencies.get_db"""
 
 def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(get_db)):
+    now = time.time()
+    key = hash_token(token)
+    with _user_cache_lock:
+        cached = _user_cache.get(key)
+    if cached is not None and cached[2] > now and _same_token(cached[0], token):
+        return cached[1]
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=["HS256"])
+        payload = _decode_token(token, key, now)
         user_id: int = payload.get("user_id")
         if user_id is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    # Validate active session for this token
-    session = (
-        db.query(UserSession)
-        .filter(UserSession.user_id == user_id, UserSession.token == token, UserSession.is_active == 1)
+    with _user_cache_lock:
+        epoch = _user_epochs.get(user_id)
+    # Validate the active session and load its user in one round trip
+    user = (
+        db.query(User)
+        .join(UserSession, UserSession.user_id == User.id)
+        .filter(
+            UserSession.token_hash == key,
+            UserSession.is_active == 1,
+            User.id == user_id,
+        )
+        .options(raiseload("*"))
         .first()
     )
-    if session is None:
-        raise credentials_exception
-
-    # Fetch user from DB
-    user = db.query(User).filter(User.id == user_id).first()
     if user is None:
         raise credentials_exception
     if not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User account is deactivated")
-    return user
+
+    # Hand out a detached snapshot on misses too, so callers see the same
+    # object type either way
+    snapshot = SimpleNamespace(**{f: getattr(user, f) for f in _USER_FIELDS})
+    exp = payload.get("exp") or 0
+    if exp > now + _USER_CACHE_MIN_LIFETIME:
+        with _user_cache_lock:
+            # Skip if forget_user() ran while the row was being read
+            if _user_epochs.get(user_id) == epoch:
+                _user_cache[key] = (token.encode("utf-8"), snapshot, exp)
+    return snapshot
+
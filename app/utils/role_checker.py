@@ -3,6 +3,8 @@ from fastapi import Depends, HTTPException, status
 from app.utils.jwt_handler import get_current_user
 
 def role_required(*allowed_roles):
+    allowed_roles = frozenset(allowed_roles)
+
     def decorator(current_user=Depends(get_current_user)):
         if current_user.role not in allowed_roles:
             raise HTTPException(
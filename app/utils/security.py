@@ -0,0 +1,79 @@
+# app/utils/security.py
+import hashlib
+import hmac
+import secrets
+import threading
+
+import bcrypt
+from cachetools import TTLCache
+
+from app.config import settings
+
+# bcrypt only uses the first 72 bytes of a password. bcrypt>=5 raises on
+# longer input instead of truncating, so truncate here; this also keeps
+# verifying hashes that passlib created (it truncated silently).
+_BCRYPT_MAX_BYTES = 72
+
+# Recently verified logins: email -> HMAC(pepper, email:password:hash).
+# The pepper is random per process, so entries are useless outside it, and
+# a changed password hash never matches an old entry.
+_LOGIN_CACHE_TTL = 300
+_PEPPER = secrets.token_bytes(32)
+_verified_logins = TTLCache(maxsize=4096, ttl=_LOGIN_CACHE_TTL)
+_verified_logins_lock = threading.Lock()
+
+# user_sessions rows are looked up by this prefix of sha256(token) instead
+# of the full JWT string
+_TOKEN_HASH_BYTES = 16
+
+
+def _secret(password: str) -> bytes:
+    return password.encode("utf-8")[:_BCRYPT_MAX_BYTES]
+
+
+def hash_password(password: str) -> str:
+    salt = bcrypt.gensalt(settings.BCRYPT_ROUNDS, prefix=b"2b")
+    return bcrypt.hashpw(_secret(password), salt).decode("ascii")
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    try:
+        return bcrypt.checkpw(_secret(password), password_hash.encode("ascii"))
+    except ValueError:
+        # Stored value is not a bcrypt hash
+        return False
+
+
+def _login_digest(email: str, password: str, password_hash: str) -> bytes:
+    message = f"{email}:{password}:{password_hash}".encode("utf-8")
+    return hmac.new(_PEPPER, message, hashlib.sha256).digest()
+
+
+def verify_login(email: str, password: str, password_hash: str) -> bool:
+    """verify_password() that skips bcrypt for a recently verified login.
+
+    Only an exact repeat of a successful email/password pair against the
+    same stored hash is served from the cache; every other attempt still
+    pays the full bcrypt cost.
+    """
+    digest = _login_digest(email, password, password_hash)
+    with _verified_logins_lock:
+        cached = _verified_logins.get(email)
+    if cached is not None and hmac.compare_digest(cached, digest):
+        return True
+    if not verify_password(password, password_hash):
+        return False
+    with _verified_logins_lock:
+        _verified_logins[email] = digest
+    return True
+
+
+def forget_login(email: str) -> None:
+    """Drop the cached verification for email, e.g. on logout."""
+    with _verified_logins_lock:
+        _verified_logins.pop(email, None)
+
+
+def hash_token(token: str) -> bytes:
+    """Digest stored in and matched against user_sessions.token_hash."""
+    return hashlib.sha256(token.encode("utf-8")).digest()[:_TOKEN_HASH_BYTES]
@@ -0,0 +1,4 @@
+import os
+
+# Settings require a database URL at import time; these tests never connect
+os.environ.setdefault("DATABASE_URL", "postgresql+psycopg://localhost/test")
@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import jwt_handler
+from app.utils.jwt_handler import create_access_token, forget_user, get_current_user
+from app.utils.security import hash_token
+
+
+class _FakeQuery:
+    def __init__(self, user, on_first=None):
+        self.user = user
+        self.on_first = on_first
+
+    def join(self, *args, **kwargs):
+        return self
+
+    def filter(self, *args, **kwargs):
+        return self
+
+    def options(self, *args, **kwargs):
+        return self
+
+    def first(self):
+        if self.on_first is not None:
+            self.on_first()
+        return self.user
+
+
+class _FakeSession:
+    def __init__(self, user, on_first=None):
+        self.user = user
+        self.on_first = on_first
+
+    def query(self, *args, **kwargs):
+        return _FakeQuery(self.user, self.on_first)
+
+
+def _user(user_id, role="employee"):
+    fields = dict.fromkeys(jwt_handler._USER_FIELDS)
+    fields.update(id=user_id, name="Test", email="test@example.com", role=role, is_active=True)
+    return SimpleNamespace(**fields)
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    yield
+    with jwt_handler._user_cache_lock:
+        jwt_handler._user_cache.clear()
+        jwt_handler._user_cache.keys_by_user.clear()
+        jwt_handler._payload_cache.clear()
+        jwt_handler._user_epochs.clear()
+
+
+def test_get_current_user_caches_snapshot():
+    token = create_access_token({"user_id": 1})
+    user = get_current_user(token, _FakeSession(_user(1)))
+    assert user.id == 1
+    assert hash_token(token) in jwt_handler._user_cache
+
+
+def test_forget_user_during_lookup_is_not_undone():
+    token = create_access_token({"user_id": 2})
+    db = _FakeSession(_user(2), on_first=lambda: forget_user(2))
+
+    # The request still gets the row it read, but must not cache it
+    assert get_current_user(token, db).id == 2
+    assert hash_token(token) not in jwt_handler._user_cache
+    assert 2 not in jwt_handler._user_cache.keys_by_user
+
+    # The next request reads the updated user
+    user = get_current_user(token, _FakeSession(_user(2, role="manager")))
+    assert user.role == "manager"